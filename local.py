@@ -49,3 +49,6 @@ LOST_CLIENTS = '''
 Количество клиентов, которые покинули АЗС, 
 не заправив автомобиль из-за "скопившейся" очереди
 '''
+TIME_OUT_OF_RANGE = '''время вне диапазона 00:00-23:59:'''
+UNKNOWN_BRAND = '''Неизвестная марка топлива в запросе:'''
+BAD_TIME_FORMAT = '''время должно быть в формате ЧЧ:ММ:'''
@@ -1,63 +1,86 @@
-import datetime
-import math
+import heapq
+import io
+import operator
+import pathlib
 import random
-from typing import Dict, Optional, Any
+import sys
+from typing import Callable, Dict, List, Optional, Any, Tuple
 import local as lcl
 
+SORTED_BRANDS = tuple(sys.intern(brand) for brand in ('АИ-80', 'АИ-92', 'АИ-95', 'АИ-98'))
+BRAND_IDS = {brand: brand_id for brand_id, brand in enumerate(SORTED_BRANDS)}
+HEAP_COMPACTION_FACTOR = 4
 
-def get_information(initial_data: str) -> Dict[int, Dict[str, Any]]:
+
+def get_information(initial_data: str) -> Tuple[Dict[str, List[Any]], List[List[int]]]:
     """
     The function for reading information about automates from a file
-    and creating a dictionary with column data.
+    and creating parallel lists with column data and an index of automates by brand.
 
     Args:
         initial_data (str): Path to the file containing automate data.
 
     Returns:
-        Dict[int, Dict[str, Any]]: A dictionary where keys are automate numbers
-         and values are dictionaries containing:
-            - 'max_queue' (int): maximum queue length
-            - 'brands' (List[str]): list of supported fuel brands
-            - 'queue' (int): current queue length
-            - 'previous_time' (datetime.datetime): the end time of the previous customer's service
-            - 'current_client' (Optional[Any]): information about the current client
+        Tuple[Dict[str, List[Any]], List[List[int]]]:
+        A dictionary of lists of equal length, where the i-th element of each list
+        describes the automate with index i:
+            - 'nums' (List[int]): automate numbers
+            - 'max_queues' (List[int]): maximum queue lengths
+            - 'brand_ids' (List[Tuple[int, ...]]): ids of supported fuel brands from SORTED_BRANDS
+            - 'brands_display' (List[str]): supported fuel brands in file order, separated by spaces
+            - 'queues' (List[int]): current queue lengths
+            - 'previous_times' (List[int]): the end times of the previous customer's service in minutes
+        and a list where the i-th element contains the indexes of the automates
+        supporting the brand with id i.
     """
 
-    automates = {}
+    automates = {'nums': [], 'max_queues': [], 'brand_ids': [], 'brands_display': [],
+                 'queues': [], 'previous_times': []}
+    num_to_idx = {}
     try:
-        with open(initial_data, 'r', encoding='utf-8') as file:
-            for line_num, line in enumerate(file, start=1):
-                stripped_line = line.strip()
-                if not stripped_line:
-                    continue
-
-                parts = stripped_line.split()
-
-                if len(parts) < 3:
-                    print(f"Warning: {lcl.LINE} {line_num} {lcl.SKIPPED_LINE} {stripped_line}")
-                    continue
-
-                try:
-                    num = int(parts[0])
-                    max_queue = int(parts[1])
-                    brands = parts[2:]
-                except ValueError as ve:
-                    print(f"Warning: {lcl.LINE} {line_num} {lcl.CONVERSION_ERROR} {ve}")
-                    continue
-
-                automates[num] = {
-                    'max_queue': max_queue,
-                    'brands': brands,
-                    'queue': 0,
-                    'previous_time': datetime.datetime.strptime('00:00', '%H:%M'),
-                    'current_client': None
-                }
+        lines = pathlib.Path(initial_data).read_text(encoding='utf-8').splitlines()
+        for line_num, line in enumerate(lines, start=1):
+            parts = line.split()
+            if not parts:
+                continue
+
+            if len(parts) < 3:
+                print(f"Warning: {lcl.LINE} {line_num} {lcl.SKIPPED_LINE} {line.strip()}")
+                continue
+
+            try:
+                num = int(parts[0])
+                max_queue = int(parts[1])
+                brand_list = parts[2:]
+                brand_ids = tuple(dict.fromkeys(BRAND_IDS[brand] for brand in brand_list if brand in BRAND_IDS))
+            except ValueError as ve:
+                print(f"Warning: {lcl.LINE} {line_num} {lcl.CONVERSION_ERROR} {ve}")
+                continue
+
+            idx = num_to_idx.get(num)
+            if idx is None:
+                num_to_idx[num] = len(automates['nums'])
+                automates['nums'].append(num)
+                automates['max_queues'].append(max_queue)
+                automates['brand_ids'].append(brand_ids)
+                automates['brands_display'].append(' '.join(brand_list))
+                automates['queues'].append(0)
+                automates['previous_times'].append(0)
+            else:
+                automates['max_queues'][idx] = max_queue
+                automates['brand_ids'][idx] = brand_ids
+                automates['brands_display'][idx] = ' '.join(brand_list)
     except FileNotFoundError:
         print(f"Error: {lcl.FILE} '{initial_data}' {lcl.FILE_NOT_FOUND}")
     except Exception as e:
         print(f"Error: {lcl.UNEXPECTED_ERROR } {e}")
 
-    return automates
+    brand_index = [[] for _ in SORTED_BRANDS]
+    for idx, brand_ids in enumerate(automates['brand_ids']):
+        for brand_id in brand_ids:
+            brand_index[brand_id].append(idx)
+
+    return automates, brand_index
 
 
 def get_request(line: str) -> Optional[Dict[str, Any]]:
@@ -69,118 +92,230 @@ def get_request(line: str) -> Optional[Dict[str, Any]]:
 
     Returns:
         Optional[Dict[str, Any]]: Dictionary with keys:
-            - 'time' (datetime.datetime): client's arrival time
+            - 'time' (int): client's arrival time in minutes since midnight
             - 'volume' (int): the requested volume of fuel in liters
             - 'brand' (str): fuel brand
-        Or None in case of a parsing error.
+            - 'brand_id' (int): index of the fuel brand in SORTED_BRANDS
+        Or None in case of a parsing error or an unknown brand.
     """
 
     try:
-        parts = line.strip().split()
+        parts = line.split()
         if len(parts) != 3:
             print(f"Warning: {lcl.BAD_REQUEST_FORMAT} {line.strip()}")
             return None
 
         time_str, volume_str, brand = parts
-        time = datetime.datetime.strptime(time_str, '%H:%M')
+        hours_str, minutes_str = time_str.split(':', 1)
+        if not all(part.isascii() and part.isdigit() and len(part) <= 2
+                   for part in (hours_str, minutes_str)):
+            raise ValueError(f"{lcl.BAD_TIME_FORMAT} {time_str}")
+        hours, minutes = int(hours_str), int(minutes_str)
+        if not (0 <= hours < 24 and 0 <= minutes < 60):
+            raise ValueError(f"{lcl.TIME_OUT_OF_RANGE} {time_str}")
+        time = hours * 60 + minutes
         volume = int(volume_str)
 
+        brand_id = BRAND_IDS.get(brand)
+        if brand_id is None:
+            print(f"Warning: {lcl.UNKNOWN_BRAND} {brand} — {lcl.LINE}: {line.strip()}")
+            return None
+
         return {
             'time': time,
             'volume': volume,
-            'brand': brand
+            'brand': SORTED_BRANDS[brand_id],
+            'brand_id': brand_id
         }
     except ValueError as e:
         print(f"Warning: {lcl.REQUEST_TRANSFORM_ERROR} {e} — {lcl.LINE}: {line.strip()}")
         return None
 
 
-def suitable_automates(request: Dict[str, Any], automates: Dict[int, Dict[str, Any]])\
-        -> Dict[int, Dict[str, Any]]:
+def format_time(minutes: int) -> str:
     """
-    The function searches for a suitable automate that support the requested brand.
+    The function converts the time in minutes since midnight to the 'HH:MM' form.
 
     Args:
-        request: A dictionary with query data containing the key 'brand'.
-        automates: A dictionary with the data of all automata.
+        minutes (int): Time in minutes since midnight.
+
     Returns:
-        Dict[int, Dict[str, Any]]: Dictionary of suitable automata,
-        where the keys are the numbers of the automata, and the values are their parameters.
+        str: Time in the 'HH:MM' format.
     """
 
-    brand = request.get('brand')
-    if brand is None:
-        print(f"Warning: {lcl.KEY_MISSING} 'brand'")
-        return {}
+    return f'{minutes // 60 % 24:02d}:{minutes % 60:02d}'
 
-    return {num: automates[num] for num in automates if brand in automates[num]['brands']}
 
+def build_brand_heaps(brand_index: List[List[int]],
+                      max_queues: List[int]) -> List[List[Tuple[int, int]]]:
+    """
+    The function creates a min-heap of free automates for every fuel brand.
+
+    Args:
+        brand_index: The indexes of automates by supported brand id.
+        max_queues: Maximum queue lengths of all automata.
 
-def automate_num(suitable: Dict[int, Dict[str, Any]]) -> int:
+    Returns:
+        List[List[Tuple[int, int]]]: Heaps of (queue length, automate index) pairs
+        of the automates with empty queues, by brand id.
     """
-    The function selects automate with the shortest queue, not exceeding the maximum.
+
+    return [[(0, idx) for idx in indexes if max_queues[idx] > 0]
+            for indexes in brand_index]
+
+
+def update_brand_heaps(brand_heaps: List[List[Tuple[int, int]]], brand_index: List[List[int]],
+                       automates: Dict[str, List[Any]], idx: int) -> None:
+    """
+    The function adds the current queue length of the automate to the heaps of its brands.
+    Entries with an outdated queue length are left in the heaps and skipped by automate_num.
+    A heap that grows past HEAP_COMPACTION_FACTOR entries per automate of its brand
+    is rebuilt from the current queue lengths.
 
     Args:
-        suitable: A dictionary of suitable automates.
+        brand_heaps: Heaps of free automates by brand id.
+        brand_index: The indexes of automates by supported brand id.
+        automates: A dictionary with the parallel lists of data of all automata.
+        idx: The index of the automate whose queue has changed.
+
+    Returns:
+        None
+    """
+
+    queues = automates['queues']
+    max_queues = automates['max_queues']
+    queue = queues[idx]
+    if queue >= max_queues[idx]:
+        return
+
+    entry = (queue, idx)
+    for brand_id in automates['brand_ids'][idx]:
+        heap = brand_heaps[brand_id]
+        heapq.heappush(heap, entry)
+
+        indexes = brand_index[brand_id]
+        if len(heap) > HEAP_COMPACTION_FACTOR * len(indexes):
+            heap[:] = [(queues[i], i) for i in indexes if queues[i] < max_queues[i]]
+            heapq.heapify(heap)
+
+
+def suitable_automates(request: Dict[str, Any],
+                       brand_heaps: List[List[Tuple[int, int]]]) -> List[Tuple[int, int]]:
+    """
+    The function searches for a suitable automate that support the requested brand.
 
+    Args:
+        request: A dictionary with query data containing the key 'brand_id'.
+        brand_heaps: Heaps of free automates by brand id.
     Returns:
-        int: The number of the selected machine, or 0 if there are no suitable machines.
+        List[Tuple[int, int]]: The heap of (queue length, automate index) pairs
+        of the suitable automata.
     """
 
-    if not suitable:
-        return 0
+    brand_id = request.get('brand_id')
+    if brand_id is None:
+        print(f"Warning: {lcl.KEY_MISSING} 'brand_id'")
+        return []
+
+    return brand_heaps[brand_id]
+
+
+def automate_num(suitable: List[Tuple[int, int]], queues: List[int]) -> Optional[int]:
+    """
+    The function selects automate with the shortest queue, not exceeding the maximum.
+    Outdated entries found on top of the heap are removed from it.
+
+    Args:
+        suitable: The heap of (queue length, automate index) pairs of suitable automates.
+        queues: Current queue lengths of all automata.
 
-    available = {num: data for num, data in suitable.items()
-                 if data['queue'] < data['max_queue']}
+    Returns:
+        Optional[int]: The index of the selected machine, or None if there are no suitable machines.
+    """
 
-    if not available:
-        return 0
+    while suitable:
+        queue, idx = suitable[0]
+        if queue == queues[idx]:
+            return idx
+        heapq.heappop(suitable)
 
-    return min(available.keys(), key=lambda x: available[x]['queue'])
+    return None
 
 
-def refuel_time(volume: int) -> int:
+def refuel_time(volume: int, variation: int) -> int:
     """
     The function calculates the refueling time based on the requested volume.
 
     Args:
         volume (int): The volume of fuel in liters.
+        variation (int): Random deviation of the refueling time in minutes (-1, 0 or 1).
 
     Returns:
         int: Estimated refueling time in minutes (minimum 1 minute).
     """
 
-    base_time = math.ceil(volume / 10)
-
-    variation = random.choice([-1, 0, 1])
+    base_time = -(-volume // 10)
 
     return max(1, base_time + variation)
 
 
-def print_automates_state(automates: Dict[int, Dict[str, Any]]) -> None:
+def automates_state_rows(automates: Dict[str, List[Any]]) -> List[Tuple[int, str]]:
+    """
+    The function prepares the unchanging part of the state line of every automate.
+    The line contains the automate number, the maximum queue length and supported fuel brands.
+
+    Args:
+        automates: A dictionary with the parallel lists of data of all automata.
+
+    Returns:
+        List[Tuple[int, str]]: Pairs of the automate index and the beginning of its state line,
+        in ascending order of automate numbers.
+    """
+
+    nums = automates['nums']
+    max_queues = automates['max_queues']
+    brands_display = automates['brands_display']
+
+    return [(idx, f'{lcl.AUTOMATE_NUMBER}{nums[idx]} {lcl.MAX_QUEUE_LENGTH}: {max_queues[idx]} '
+                  f'{lcl.GASOLINE_BRANDS}: {brands_display[idx]} ->')
+            for idx in sorted(range(len(nums)), key=nums.__getitem__)]
+
+
+def print_automates_state(automates: Dict[str, List[Any]], state_rows: List[Tuple[int, str]],
+                          stars: Tuple[str, ...], emit: Callable[[str], None],
+                          last_state: Optional[Tuple[int, ...]] = None) -> Tuple[int, ...]:
     """
     The function prints the current state of all automates.
     Displays for each vending machine its number and the maximum queue length.,
     supported fuel brands and the current queue in the form of stars.
+    Nothing is printed if the queues have not changed since the previous print.
 
     Args:
-        automates: A dictionary with the data of all automata.
+        automates: A dictionary with the parallel lists of data of all automata.
+        state_rows: The automate indexes and beginnings of state lines from automates_state_rows.
+        stars: Queue displays, where the i-th element is a string of i stars.
+        emit: The function that outputs a line of text.
+        last_state: The queue lengths returned by the previous call.
 
     Returns:
-        None: The function don't return anything, only outputs information to the console.
+        Tuple[int, ...]: The current queue lengths of all automata.
     """
 
-    for num in sorted(automates.keys()):
-        automate = automates[num]
-        queue_display = '*' * automate['queue']
-        print(f'{lcl.AUTOMATE_NUMBER}{num} {lcl.MAX_QUEUE_LENGTH}: {automate["max_queue"]} '
-              f'{lcl.GASOLINE_BRANDS}: {" ".join(automate["brands"])} '
-              f'->{queue_display}')
+    queues = automates['queues']
+    state = tuple(queues)
+    if state == last_state:
+        return state
+
+    if state_rows:
+        emit('\n'.join([prefix + stars[queues[idx]] for idx, prefix in state_rows]))
+
+    return state
 
 
 def calculate_lost_profit(petrol_prices:  Dict[str, float],
                           fuel_sold_by_brand:  Dict[str, int],
-                          lost_clients_by_brand:  Dict[str, int]) -> None:
+                          lost_clients_by_brand:  Dict[str, int],
+                          emit: Callable[[str], None] = print) -> None:
     """
     The function calculates and analyzes lost profit and recommends a new fuel column.
 
@@ -188,23 +323,25 @@ def calculate_lost_profit(petrol_prices:  Dict[str, float],
         petrol_prices: Dictionary of fuel prices by brand.
         fuel_sold_by_brand: A dictionary with volumes of fuel sold by brand.
         lost_clients_by_brand: A dictionary with the number of lost customers by brand.
+        emit: The function that outputs a line of text.
 
     Returns:
-        None: The function don't return anything, only outputs information to the console.
+        None: The function don't return anything, only outputs information through emit.
     """
-    print(f"\n{'~' * 60}")
-    print(f"{lcl.ANALYSIS_ADDITIONAL_RENTABILITY}")
-    print(f"{'~' * 60}")
+    emit(f"\n{'~' * 60}")
+    emit(f"{lcl.ANALYSIS_ADDITIONAL_RENTABILITY}")
+    emit(f"{'~' * 60}")
 
-    print(f"\n{lcl.LOST_CLIENTS_BY_BRANDS}")
+    emit(f"\n{lcl.LOST_CLIENTS_BY_BRANDS}")
     total_lost_volume = 0
     total_lost_revenue = 0
+    total_sold = max(1, sum(fuel_sold_by_brand.values()))
 
-    for brand in sorted(petrol_prices.keys()):
+    for brand in SORTED_BRANDS:
         lost_count = lost_clients_by_brand.get(brand, 0)
         if lost_count > 0:
             if fuel_sold_by_brand[brand] > 0:
-                avg_volume = fuel_sold_by_brand[brand] / max(1, sum(fuel_sold_by_brand.values()))
+                avg_volume = fuel_sold_by_brand[brand] / total_sold
             else:
                 avg_volume = 30
 
@@ -214,38 +351,38 @@ def calculate_lost_profit(petrol_prices:  Dict[str, float],
             total_lost_volume += lost_volume
             total_lost_revenue += lost_revenue
 
-            print(f"  {brand}: {lost_count} {lcl.CLIENTS} "
-                  f"{lcl.LOST} ~{lost_volume:.1f} {lcl.LITERS} "
-                  f"{lcl.LOST_REVENUE} ~{lost_revenue:.2f} {lcl.RUBLES}")
+            emit(f"  {brand}: {lost_count} {lcl.CLIENTS} "
+                 f"{lcl.LOST} ~{lost_volume:.1f} {lcl.LITERS} "
+                 f"{lcl.LOST_REVENUE} ~{lost_revenue:.2f} {lcl.RUBLES}")
 
-    print(f"\n{lcl.TOTAL_LOST} {total_lost_volume:.1f} {lcl.LITERS} "
-          f"{lcl.LOST_REVENUE} {total_lost_revenue:.2f} {lcl.RUBLES}")
+    emit(f"\n{lcl.TOTAL_LOST} {total_lost_volume:.1f} {lcl.LITERS} "
+         f"{lcl.LOST_REVENUE} {total_lost_revenue:.2f} {lcl.RUBLES}")
 
-    print(f"\n{lcl.ANALYZE_NEW_COLUMN}")
+    emit(f"\n{lcl.ANALYZE_NEW_COLUMN}")
 
     if lost_clients_by_brand:
         most_lost_brand = max(lost_clients_by_brand.items(),
-                              key=lambda x: x[1])[0]
+                              key=operator.itemgetter(1))[0]
 
-        print(f"{lcl.HIGHEST_LOST_CLENTS} {most_lost_brand}")
-        print(f"{lcl.RECOMMEND_INSTALLATION} {most_lost_brand}")
+        emit(f"{lcl.HIGHEST_LOST_CLENTS} {most_lost_brand}")
+        emit(f"{lcl.RECOMMEND_INSTALLATION} {most_lost_brand}")
 
         monthly_lost_revenue = total_lost_revenue * 30
         column_cost = 1700000
         months_to_payback = column_cost / monthly_lost_revenue if monthly_lost_revenue > 0 else float('inf')
 
-        print(f"\n{lcl.EVALUATION_RENTABILITY}")
-        print(f"{lcl.MONTHLY_LOSS_BENEFIT} {monthly_lost_revenue:,.0f} {lcl.RUBLES}")
-        print(f"{lcl.APPROXIMATE_COST_COLUMN} {column_cost:,.0f} {lcl.RUBLES}")
+        emit(f"\n{lcl.EVALUATION_RENTABILITY}")
+        emit(f"{lcl.MONTHLY_LOSS_BENEFIT} {monthly_lost_revenue:,.0f} {lcl.RUBLES}")
+        emit(f"{lcl.APPROXIMATE_COST_COLUMN} {column_cost:,.0f} {lcl.RUBLES}")
 
         if months_to_payback <= 12:
-            print(f"{lcl.PAYBACK_PERIOD} {months_to_payback:.1f} {lcl.MONTHS} {lcl.PROFITABLE}")
+            emit(f"{lcl.PAYBACK_PERIOD} {months_to_payback:.1f} {lcl.MONTHS} {lcl.PROFITABLE}")
         elif months_to_payback <= 24:
-            print(f"{lcl.PAYBACK_PERIOD} {months_to_payback:.1f} {lcl.MONTHS} {lcl.MODERATELY_PROFITABLE}")
+            emit(f"{lcl.PAYBACK_PERIOD} {months_to_payback:.1f} {lcl.MONTHS} {lcl.MODERATELY_PROFITABLE}")
         else:
-            print(f"{lcl.PAYBACK_PERIOD} {months_to_payback:.1f} {lcl.MONTHS} {lcl.UNPROFITABLE}")
+            emit(f"{lcl.PAYBACK_PERIOD} {months_to_payback:.1f} {lcl.MONTHS} {lcl.UNPROFITABLE}")
     else:
-        print(f"{lcl.NO_ADDITIONAL_CLIENTS}")
+        emit(f"{lcl.NO_ADDITIONAL_CLIENTS}")
 
 
 def main() -> None:
@@ -263,103 +400,137 @@ def main() -> None:
         None
     """
 
-    petrol_prices = {'АИ-80': 38.0, 'АИ-92': 60.5, 'АИ-95': 65.0, 'АИ-98': 82.3}
+    petrol_prices = (38.0, 60.5, 65.0, 82.3)
 
-    fuel_sold = {'АИ-80': 0, 'АИ-92': 0, 'АИ-95': 0, 'АИ-98': 0}
-    total_revenue = 0
+    fuel_sold = [0] * len(SORTED_BRANDS)
     lost_clients = 0
-    lost_clients_by_brand = {'АИ-80': 0, 'АИ-92': 0, 'АИ-95': 0, 'АИ-98': 0}
+    lost_clients_by_brand = [0] * len(SORTED_BRANDS)
 
-    automates = get_information('azs_data.txt')
+    automates, brand_index = get_information('azs_data.txt')
+    nums = automates['nums']
+    queues = automates['queues']
+    max_queues = automates['max_queues']
+    previous_times = automates['previous_times']
+    state_rows = automates_state_rows(automates)
+    brand_heaps = build_brand_heaps(brand_index, max_queues)
+    stars = tuple('*' * i for i in range(max(0, max(max_queues, default=0)) + 1))
 
     finish_events = {}
+    finish_minutes = []
 
-    with open('input.txt', 'r', encoding='utf-8') as requests_file:
-        all_requests = [get_request(line) for line in requests_file if line.strip()]
+    last_state = None
+    buffer = io.StringIO()
 
-    all_requests.sort(key=lambda x: x['time'])
+    def emit(text: str, _write=buffer.write) -> None:
+        _write(text)
+        _write('\n')
 
-    for request in all_requests:
-        current_time = request['time']
+    all_requests = []
+    for line in pathlib.Path('input.txt').read_text(encoding='utf-8').splitlines():
+        if not line or line.isspace():
+            continue
 
-        while finish_events and min(finish_events.keys()) <= current_time:
-            finish_time = min(finish_events.keys())
-            finish_info = finish_events[finish_time]
+        request = get_request(line)
+        if request is not None:
+            all_requests.append(request)
 
-            print(f'\nВ {finish_time.strftime("%H:%M")} {lcl.CLIENT} {finish_info["arrival_time"].strftime("%H:%M")} '
-                  f'{finish_info["brand"]} {finish_info["volume"]} {finish_info["duration"]} '
-                  f'{lcl.FINISHED_REFUELING}')
+    arrival_times = [request['time'] for request in all_requests]
+    if any(map(operator.gt, arrival_times, arrival_times[1:])):
+        all_requests.sort(key=operator.itemgetter('time'))
+    variations = random.choices((-1, 0, 1), k=len(all_requests))
 
-            automate = automates[finish_info['num']]
-            automate['queue'] -= 1
-            automate['previous_time'] = finish_time
-            automate['current_client'] = None
+    for request, variation in zip(all_requests, variations):
+        current_time = request['time']
+        request_brand = request['brand']
+        request_brand_id = request['brand_id']
+        request_volume = request['volume']
+
+        while finish_minutes and finish_minutes[0] <= current_time:
+            event_time = heapq.heappop(finish_minutes)
+            for finish_info in finish_events.pop(event_time):
+                emit(f'\nВ {format_time(event_time)} {lcl.CLIENT} {finish_info["arrival_str"]} '
+                     f'{finish_info["brand"]} {finish_info["volume"]} {finish_info["duration"]} '
+                     f'{lcl.FINISHED_REFUELING}')
 
-            del finish_events[finish_time]
+                idx = finish_info['idx']
+                queues[idx] -= 1
+                previous_times[idx] = event_time
+                update_brand_heaps(brand_heaps, brand_index, automates, idx)
 
-            print_automates_state(automates)
+                last_state = print_automates_state(automates, state_rows, stars, emit, last_state)
 
-        suitable = suitable_automates(request, automates)
-        chosen_num = automate_num(suitable)
+        request_str = format_time(current_time)
+        suitable = suitable_automates(request, brand_heaps)
+        chosen_idx = automate_num(suitable, queues)
 
-        if not chosen_num:
+        if chosen_idx is None:
             lost_clients += 1
-            lost_clients_by_brand[request['brand']] += 1
-            print(f'\nВ {request["time"].strftime("%H:%M")} {lcl.CLIENT_LEFT} {request["brand"]} '
-                  f'{lcl.CLIENT_LEFT_STATION}')
-            print_automates_state(automates)
+            lost_clients_by_brand[request_brand_id] += 1
+            emit(f'\nВ {request_str} {lcl.CLIENT_LEFT} {request_brand} '
+                 f'{lcl.CLIENT_LEFT_STATION}')
+            last_state = print_automates_state(automates, state_rows, stars, emit, last_state)
         else:
-            duration = refuel_time(request['volume'])
+            duration = refuel_time(request_volume, variation)
+
+            queues[chosen_idx] += 1
+            update_brand_heaps(brand_heaps, brand_index, automates, chosen_idx)
 
-            automates[chosen_num]['queue'] += 1
+            emit(f'\nВ {request_str} {lcl.NEW_CLIENT}: '
+                 f'{request_str} {request_brand} {request_volume} {duration} '
+                 f'{lcl.CLIENT_QUEUED}{nums[chosen_idx]}')
 
-            print(f'\nВ {request["time"].strftime("%H:%M")} {lcl.NEW_CLIENT}: '
-                  f'{request["time"].strftime("%H:%M")} {request["brand"]} {request["volume"]} {duration} '
-                  f'{lcl.CLIENT_QUEUED}{chosen_num}')
+            last_state = print_automates_state(automates, state_rows, stars, emit, last_state)
 
-            print_automates_state(automates)
+            previous_finish = previous_times[chosen_idx]
+            start_time = previous_finish if previous_finish > current_time else current_time
+            finish_time = start_time + duration
 
-            previous_finish = automates[chosen_num]['previous_time']
-            start_time = max(previous_finish, request['time'])
-            finish_time = start_time + datetime.timedelta(minutes=duration)
+            bucket = finish_events.get(finish_time)
+            if bucket is None:
+                bucket = finish_events[finish_time] = []
+                heapq.heappush(finish_minutes, finish_time)
 
-            finish_events[finish_time] = {
-                'num': chosen_num,
-                'arrival_time': request['time'],
-                'brand': request['brand'],
-                'volume': request['volume'],
+            bucket.append({
+                'idx': chosen_idx,
+                'arrival_str': request_str,
+                'brand': request_brand,
+                'volume': request_volume,
                 'duration': duration
-            }
+            })
 
-            fuel_sold[request['brand']] += request['volume']
-            total_revenue += request['volume'] * petrol_prices[request['brand']]
+            fuel_sold[request_brand_id] += request_volume
 
-    while finish_events:
-        finish_time = min(finish_events.keys())
-        finish_info = finish_events[finish_time]
+    while finish_minutes:
+        event_time = heapq.heappop(finish_minutes)
+        for finish_info in finish_events.pop(event_time):
+            emit(f'\nВ {format_time(event_time)} {lcl.CLIENT} {finish_info["arrival_str"]} '
+                 f'{finish_info["brand"]} {finish_info["volume"]} {finish_info["duration"]} '
+                 f'{lcl.FINISHED_REFUELING}')
 
-        print(f'\nВ {finish_time.strftime("%H:%M")} {lcl.CLIENT} {finish_info["arrival_time"].strftime("%H:%M")} '
-              f'{finish_info["brand"]} {finish_info["volume"]} {finish_info["duration"]} '
-              f'{lcl.FINISHED_REFUELING}')
+            idx = finish_info['idx']
+            queues[idx] -= 1
+            previous_times[idx] = event_time
+            update_brand_heaps(brand_heaps, brand_index, automates, idx)
 
-        automates[finish_info['num']]['queue'] -= 1
-        automates[finish_info['num']]['previous_time'] = finish_time
-        automates[finish_info['num']]['current_client'] = None
+            last_state = print_automates_state(automates, state_rows, stars, emit, last_state)
 
-        del finish_events[finish_time]
+    total_revenue = sum(map(operator.mul, fuel_sold, petrol_prices))
 
-        print_automates_state(automates)
+    emit(f'\n{"~" * 60}')
+    emit(f'{lcl.GASOLINE_SOLD}:')
+    for brand, sold in zip(SORTED_BRANDS, fuel_sold):
+        emit(f'  {brand}: {sold} л')
 
-    print(f'\n{"~" * 60}')
-    print(f'{lcl.GASOLINE_SOLD}:')
-    for brand in sorted(fuel_sold.keys()):
-        print(f'  {brand}: {fuel_sold[brand]} л')
+    emit(f'\n{lcl.GASOLINE_SOLD_FINALL}: {sum(fuel_sold)} л')
+    emit(f'{lcl.REVENUE}: {total_revenue:.2f} {lcl.RUBLES}')
+    emit(f'{lcl.LOST_CLIENTS}: {lost_clients}')
 
-    print(f'\n{lcl.GASOLINE_SOLD_FINALL}: {sum(fuel_sold.values())} л')
-    print(f'{lcl.REVENUE}: {total_revenue:.2f} {lcl.RUBLES}')
-    print(f'{lcl.LOST_CLIENTS}: {lost_clients}')
+    calculate_lost_profit(dict(zip(SORTED_BRANDS, petrol_prices)),
+                          dict(zip(SORTED_BRANDS, fuel_sold)),
+                          dict(zip(SORTED_BRANDS, lost_clients_by_brand)),
+                          emit)
 
-    calculate_lost_profit(petrol_prices, fuel_sold, lost_clients_by_brand)
+    sys.stdout.write(buffer.getvalue())
 
 
 if __name__ == '__main__':